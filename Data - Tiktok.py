@@ -1,15 +1,29 @@
-import pyktok as pyk
+import numpy as np
 import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import pyarrow as pa
+import csv
 import os
+import tempfile
 from datetime import datetime
 
-# Set up browser for pyktok
-pyk.specify_browser('firefox')  # Adjust as needed for your environment
+# Pyktok's browser is set up on first use rather than at import time
+_browser_set = False
+
+# Set up browser for pyktok, once
+def setup_browser():
+    global _browser_set
+    import pyktok as pyk
+    
+    if not _browser_set:
+        pyk.specify_browser('firefox')  # Adjust as needed for your environment
+        _browser_set = True
+    return pyk
 
 # Set up Google Sheets API
 def connect_to_google_sheets():
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+    
     scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
     credentials = ServiceAccountCredentials.from_json_keyfile_name("D:/4handy/Python/n8n-3-452909-dcc8b437ed91.json", scope)
     client = gspread.authorize(credentials)
@@ -25,13 +39,36 @@ def get_tiktok_links():
     # Select the specific worksheet
     worksheet = sheet.worksheet("W13 (24/3 - 30/3)")
     
-    # Get all values from column K (11th column, 0-indexed)
-    column_k = worksheet.col_values(11)  # Column K is the 11th column
+    # Get column K below the header; the API drops trailing empty cells
+    value_ranges = worksheet.batch_get(["K2:K"], major_dimension="COLUMNS")
+    column_k = value_ranges[0][0] if value_ranges and value_ranges[0] else []
     
-    # Filter out empty values and headers
-    tiktok_links = [link for link in column_k if 'tiktok.com' in link]
+    # Filter out empty values and headers in one vectorized pass
+    column = pd.Series(column_k, dtype="string")
+    mask = column.str.contains("tiktok.com", regex=False, na=False)
     
-    return tiktok_links
+    # Drop repeated links while keeping sheet order
+    return list(dict.fromkeys(column[mask].tolist()))
+
+# Allocate a typed buffer plus NA mask for one column; Arrow numeric and boolean
+# columns use their NumPy equivalent, everything else holds Python objects
+def allocate_buffer(dtype, size):
+    np_dtype = dtype.numpy_dtype if isinstance(dtype, pd.ArrowDtype) else dtype
+    if np_dtype.kind not in "biuf":
+        np_dtype = np.dtype(object)
+    return np.empty(size, dtype=np_dtype), np.zeros(size, dtype=bool)
+
+# Turn the filled part of the pre-sized buffers into a DataFrame with the original dtypes
+def build_presized_frame(columns, n_rows, schema):
+    data = {}
+    for c, (values, na_mask) in columns.items():
+        dtype = schema[c]
+        if isinstance(dtype, pd.ArrowDtype):
+            arrow_values = pa.array(values[:n_rows], type=dtype.pyarrow_dtype, mask=na_mask[:n_rows])
+            data[c] = pd.arrays.ArrowExtensionArray(arrow_values)
+        else:
+            data[c] = values[:n_rows]
+    return pd.DataFrame(data)
 
 # Process TikTok links and save data to a single file
 def process_tiktok_links(links):
@@ -43,57 +80,85 @@ def process_tiktok_links(links):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     combined_filename = f"{output_dir}/all_tiktok_data_{timestamp}.csv"
     
-    # Initialize an empty DataFrame to hold all data
-    all_data = pd.DataFrame()
+    # Pyktok returns one row per link, so combined columns are pre-sized from
+    # the first link's schema; frames only collects data if that doesn't hold
+    schema = None
+    columns = {}
+    n_rows = 0
+    frames = None
     
-    # Process each link
+    # Process each link; temp files live in a scratch directory removed in one go
+    pyk = setup_browser()
     results = []
-    for i, link in enumerate(links):
-        try:
-            print(f"Processing link {i+1}/{len(links)}: {link}")
-            
-            # Create a temporary filename for this link's data
-            temp_filename = f"{output_dir}/temp_tiktok_data_{i+1}.csv"
-            
-            # Download TikTok data
-            pyk.save_tiktok(link, True, temp_filename)
-            
-            # Read the data from the temp file
-            temp_data = pd.read_csv(temp_filename)
-            
-            # Add the source link as a column
-            temp_data['source_link'] = link
-            temp_data['link_index'] = i+1
-            
-            # Append to the combined DataFrame
-            all_data = pd.concat([all_data, temp_data], ignore_index=True)
-            
-            # Delete the temporary file
-            os.remove(temp_filename)
-            
-            results.append({
-                "index": i+1, 
-                "link": link, 
-                "status": "Success"
-            })
-            
-        except Exception as e:
-            print(f"Error processing link {link}: {str(e)}")
-            results.append({
-                "index": i+1, 
-                "link": link, 
-                "status": "Failed", 
-                "error": str(e)
-            })
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmpdir:
+        for i, link in enumerate(links):
+            try:
+                print(f"Processing link {i+1}/{len(links)}: {link}")
+                
+                # Create a temporary filename for this link's data
+                temp_filename = os.path.join(tmpdir, f"t_{i+1}.csv")
+                
+                # Download TikTok data
+                pyk.save_tiktok(link, True, temp_filename)
+                
+                # Read the data from the temp file
+                temp_data = pd.read_csv(temp_filename, engine="pyarrow", dtype_backend="pyarrow")
+                
+                # Add the source link as a column
+                temp_data['source_link'] = link
+                temp_data['link_index'] = i+1
+                
+                # Write the row in place, or fall back to concat on a schema change
+                if schema is None:
+                    schema = temp_data.dtypes.to_dict()
+                    columns = {c: allocate_buffer(d, len(links)) for c, d in schema.items()}
+                if frames is None and len(temp_data) == 1 and temp_data.dtypes.to_dict() == schema:
+                    for c, (values, na_mask) in columns.items():
+                        value = temp_data[c].iloc[0]
+                        if pd.isna(value):
+                            na_mask[n_rows] = True
+                        else:
+                            values[n_rows] = value
+                    n_rows += 1
+                else:
+                    if frames is None:
+                        frames = [build_presized_frame(columns, n_rows, schema)]
+                    frames.append(temp_data)
+                
+                results.append({
+                    "index": i+1, 
+                    "link": link, 
+                    "status": "Success"
+                })
+                
+            except Exception as e:
+                print(f"Error processing link {link}: {str(e)}")
+                results.append({
+                    "index": i+1, 
+                    "link": link, 
+                    "status": "Failed", 
+                    "error": str(e)
+                })
+        
+    # Build the combined frame, concatenating only if we had to fall back
+    if frames is not None:
+        all_data = pd.concat(frames, ignore_index=True, copy=False)
+    elif n_rows:
+        all_data = build_presized_frame(columns, n_rows, schema)
+    else:
+        all_data = pd.DataFrame()
     
     # Save all data to a single file
     if not all_data.empty:
         all_data.to_csv(combined_filename, index=False)
         print(f"All data saved to {combined_filename}")
     
-    # Create a summary report
-    summary_df = pd.DataFrame(results)
-    summary_df.to_csv(f"{output_dir}/processing_summary_{timestamp}.csv", index=False)
+    # Create a summary report, written straight from the result rows
+    summary_path = os.path.join(output_dir, f"processing_summary_{timestamp}.csv")
+    with open(summary_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["index", "link", "status", "error"])
+        writer.writeheader()
+        writer.writerows(results)
     
     return results, combined_filename
 
@@ -120,10 +185,10 @@ import pandas as pd
 
 # Đọc file CSV gốc
 input_file = "C:/Users/wind4/tiktok_data/all_tiktok_data_20250415_092751.csv"
-df = pd.read_csv(input_file)
+df = pd.read_csv(input_file, engine="pyarrow", dtype_backend="pyarrow")
 
 # Tạo cột STT (số thứ tự)
-df['STT'] = range(1, len(df) + 1)
+df['STT'] = np.arange(1, len(df) + 1, dtype=np.int32)
 
 # Chọn và đổi tên các cột theo yêu cầu
 output_df = df[['STT', 'source_link', 'video_playcount', 'author_username', 'author_followercount']].copy()
@@ -1,9 +1,103 @@
 import abc
+import csv
+import functools
 import os
+import random
+import re
+import threading
 import time
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Optional
+
+# Google Sheets API settings
+CREDENTIALS_FILE = "D:/4handy/Python/n8n-3-452909-dcc8b437ed91.json"
+GOOGLE_SCOPES = ['https://spreadsheets.google.com/feeds', 
+                'https://www.googleapis.com/auth/drive']
+MAX_CELLS_PER_WRITE = 50_000
+MAX_CELLS_PER_REQUEST = 200_000
+MAX_RETRIES = 5
+
+# Source spreadsheet; set SHEET_ID to its key to skip the Drive title search
+SHEET_ID = ""
+SHEET_NAME = "Ecom - Booking KOC Tiktok - Abby Official Plan"
+WORKSHEET_NAME = "W13 (24/3 - 30/3)"
+
+# Column K holds the TikTok links, row 1 is the header
+LINK_RANGE = "K2:K"
+TIKTOK_DOMAIN = "tiktok.com"
+
+# Columns of the per-link processing summary
+SUMMARY_FIELDS = ["index", "link", "status", "error"]
+
+def retry_on_rate_limit(func):
+    """Wrap a Google Sheets call to retry with exponential backoff on HTTP 429"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        from gspread.exceptions import APIError
+        
+        for attempt in range(MAX_RETRIES):
+            try:
+                return func(*args, **kwargs)
+            except APIError as e:
+                if e.response.status_code != 429 or attempt == MAX_RETRIES - 1:
+                    raise
+                delay = 2 ** attempt + random.random()
+                print(f"Google Sheets rate limit hit, retrying in {delay:.1f} seconds...")
+                time.sleep(delay)
+    return wrapper
+
+@functools.lru_cache(maxsize=1)
+def _get_gspread_client():
+    """Connect to Google Sheets API once and share the authorized client"""
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    credentials = ServiceAccountCredentials.from_json_keyfile_name(
+        CREDENTIALS_FILE, GOOGLE_SCOPES)
+    client = gspread.authorize(credentials)
+    
+    # Pool connections and retry transient errors on the authorized session;
+    # once retries run out the last response reaches gspread as an APIError
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=Retry(total=5, backoff_factor=0.5,
+                          status_forcelist=[429, 500, 502, 503, 504],
+                          raise_on_status=False)
+    )
+    # gspread 6 keeps the session on client.http_client, older versions on the client
+    session = getattr(client, "http_client", client).session
+    session.mount("https://", adapter)
+    
+    return client
+
+RATE_LIMIT_RE = re.compile(r"\b429\b|too many requests|rate limit", re.IGNORECASE)
+
+class RateLimitedError(Exception):
+    """Raised when a remote service throttles our requests"""
+    pass
+
+class NoVideoDataError(RateLimitedError):
+    """Raised when TikTok returns a page without video data, which may or may not be throttling"""
+    pass
+
+def is_rate_limited(error: Exception) -> bool:
+    """Check whether an error was caused by HTTP 429 / rate limiting"""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    # Match status tokens only; video IDs in URLs often contain the digits 429
+    return RATE_LIMIT_RE.search(str(error)) is not None
+
+# Seconds to wait on a video download before giving up
+VIDEO_DOWNLOAD_TIMEOUT = 60
 
 # Abstract base classes to follow SOLID principles
 
@@ -17,7 +111,7 @@ class DataSource(abc.ABC):
 class DataFetcher(abc.ABC):
     """Abstract base class for data fetchers"""
     @abc.abstractmethod
-    def fetch_data(self, link: str, output_path: str) -> pd.DataFrame:
+    def fetch_data(self, link: str, output_path: str = "") -> pd.DataFrame:
         """Fetches data from a link and returns it as a DataFrame"""
         pass
 
@@ -34,47 +128,77 @@ class DataStorage(abc.ABC):
     def save_data(self, df: pd.DataFrame, filename: str) -> str:
         """Saves data to storage and returns the path or id"""
         pass
+    
+    def save_rows(self, rows: List[Dict], fieldnames: List[str], filename: str) -> str:
+        """Saves a list of row dicts; storages can override this to skip the DataFrame"""
+        if not rows:
+            return ""
+        return self.save_data(pd.DataFrame(rows, columns=fieldnames), filename)
+
+class StreamingDataStorage(DataStorage):
+    """Abstract base class for storages that accept data incrementally"""
+    @abc.abstractmethod
+    def open(self, filename: str):
+        """Starts a new stream under the given name"""
+        pass
+    
+    @abc.abstractmethod
+    def append(self, df: pd.DataFrame):
+        """Appends rows to the open stream"""
+        pass
+    
+    @abc.abstractmethod
+    def close(self) -> str:
+        """Finishes the stream and returns the path or id, empty if nothing was written"""
+        pass
+    
+    @abc.abstractmethod
+    def load(self) -> pd.DataFrame:
+        """Reads back everything written to the last stream"""
+        pass
 
 # Concrete implementations
 
 class GoogleSheetsDataSource(DataSource):
     """Retrieves TikTok links from Google Sheets"""
     def __init__(self):
-        self.client = self._connect_to_google_sheets()
-        
-    def _connect_to_google_sheets(self):
-        """Connect to Google Sheets API"""
-        import gspread
-        from oauth2client.service_account import ServiceAccountCredentials
+        self.client = _get_gspread_client()
+        self._worksheet = None
         
-        scope = ['https://spreadsheets.google.com/feeds', 
-                'https://www.googleapis.com/auth/drive']
-        credentials = ServiceAccountCredentials.from_json_keyfile_name(
-            "D:/4handy/Python/n8n-3-452909-dcc8b437ed91.json", scope)
-        client = gspread.authorize(credentials)
-        return client
+    def _get_worksheet(self):
+        """Open the links worksheet once and reuse the handle"""
+        if self._worksheet is None:
+            # Opening by key is a single GET; opening by title searches Drive
+            if SHEET_ID:
+                sheet = self.client.open_by_key(SHEET_ID)
+            else:
+                sheet = self.client.open(SHEET_NAME)
+            
+            # Select the specific worksheet
+            self._worksheet = sheet.worksheet(WORKSHEET_NAME)
+        return self._worksheet
         
     def get_links(self) -> List[str]:
         """Get TikTok links from Google Sheet"""
-        # Open the spreadsheet by name
-        sheet = self.client.open("Ecom - Booking KOC Tiktok - Abby Official Plan")
+        worksheet = self._get_worksheet()
         
-        # Select the specific worksheet
-        worksheet = sheet.worksheet("W13 (24/3 - 30/3)")
+        # Get column K below the header; the API drops trailing empty cells
+        value_ranges = worksheet.batch_get([LINK_RANGE], major_dimension="COLUMNS")
+        column_values = value_ranges[0][0] if value_ranges and value_ranges[0] else []
         
-        # Get all values from the specified column
-        column_values = worksheet.col_values(11)  # Column K is the 11th column
+        # Filter out empty values and non-TikTok links in one vectorized pass
+        column = pd.Series(column_values, dtype="string")
+        mask = column.str.contains(TIKTOK_DOMAIN, regex=False, na=False)
         
-        # Filter out empty values and non-TikTok links
-        tiktok_links = [link for link in column_values if 'tiktok.com' in str(link)]
-        
-        return tiktok_links
+        # Repeated links are kept; the collector dedupes them and reports every row
+        return column[mask].tolist()
 
 class TikTokDataFetcher(DataFetcher):
     """Fetches data from TikTok links"""
-    def __init__(self, wait_time: int = 5):
-        """Initialize with wait time between requests"""
+    def __init__(self, wait_time: int = 5, save_video: bool = True):
+        """Initialize with wait time between requests and whether to download videos"""
         self.wait_time = wait_time
+        self.save_video = save_video
         self._setup_browser()
         
     def _setup_browser(self):
@@ -82,67 +206,119 @@ class TikTokDataFetcher(DataFetcher):
         import pyktok as pyk
         pyk.specify_browser('firefox')
         
-    def fetch_data(self, link: str, output_path: str) -> pd.DataFrame:
-        """Fetch data from a TikTok link"""
-        try:
-            import pyktok as pyk
+    def _build_data_row(self, link: str) -> Tuple[pd.DataFrame, Dict]:
+        """Build the metadata row pyktok would otherwise write to CSV, plus the raw video object"""
+        import pyktok as pyk
+        
+        # Same lookup order as pyk.save_tiktok, without the file round-trip
+        tt_json = pyk.get_tiktok_json(link)
+        if tt_json is not None:
+            video_id = list(tt_json['ItemModule'].keys())[0]
+            video_obj = tt_json['ItemModule'][video_id]
+            data_row = pyk.generate_data_row(video_obj)
+            try:
+                user_id = list(tt_json['UserModule']['users'].keys())[0]
+                data_row.loc[0, 'author_verified'] = tt_json['UserModule']['users'][user_id]['verified']
+            except Exception:
+                pass
+        else:
+            tt_json = pyk.alt_get_tiktok_json(link)
+            if tt_json is None:
+                # Pyktok ignores the HTTP status, so a throttled page just has no data;
+                # deleted or blocked videos look the same, so this is only a suspicion
+                raise NoVideoDataError(f"No video data returned for {link}")
+            video_obj = tt_json['__DEFAULT_SCOPE__']['webapp.video-detail']['itemInfo']['itemStruct']
+            data_row = pyk.generate_data_row(video_obj)
+            try:
+                data_row.loc[0, 'author_verified'] = video_obj['author']['verified']
+            except Exception:
+                pass
+                
+        return data_row, video_obj
+        
+    def _download_video(self, link: str, video_obj: Dict):
+        """Save the video file from already fetched metadata, named like pyk.save_tiktok does"""
+        import pyktok as pyk
+        import requests
+        
+        # Slideshows have images and music instead of a video file
+        if 'imagePost' in video_obj:
+            print(f"Skipping video download for slideshow post {link}")
+            return
             
-            # Download TikTok data
-            pyk.save_tiktok(link, True, output_path)
+        video = video_obj.get('video') or {}
+        video_url = video.get('downloadAddr') or video.get('playAddr')
+        if not video_url:
+            print(f"No video URL found for {link}, skipping download")
+            return
+        
+        video_fn = re.findall(r'(?<=\.com/)(.+?)(?=\?|$)', link)[0].replace('/', '_') + '.mp4'
+        headers = dict(pyk.headers, referer='https://www.tiktok.com/')
+        
+        response = requests.get(video_url, allow_redirects=True, headers=headers,
+                                cookies=getattr(pyk, 'cookies', None),
+                                timeout=VIDEO_DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+        with open(video_fn, 'wb') as f:
+            f.write(response.content)
+        
+    def fetch_data(self, link: str, output_path: str = "") -> pd.DataFrame:
+        """Fetch data from a TikTok link (output_path is kept for compatibility and ignored)"""
+        try:
+            # Build the data in memory, backed by Arrow dtypes
+            data_row, video_obj = self._build_data_row(link)
+            data = data_row.convert_dtypes(dtype_backend="pyarrow")
             
-            # Read the data from the file
-            data = pd.read_csv(output_path)
+            # A failed download must not throw away the metadata we already have
+            if self.save_video:
+                try:
+                    self._download_video(link, video_obj)
+                except Exception as e:
+                    print(f"Error downloading video from {link}: {str(e)}")
             
             # Add the source link as a column
             data['source_link'] = link
                 
             return data
         
+        except RateLimitedError:
+            raise
+        
         except Exception as e:
+            # Let throttling surface so the collector can back off and retry
+            if is_rate_limited(e):
+                raise RateLimitedError(str(e)) from e
+            
             print(f"Error fetching data from {link}: {str(e)}")
             # Return empty DataFrame in case of error
             return pd.DataFrame()
 
 class TikTokDataProcessor(DataProcessor):
     """Processes TikTok data"""
+    # Output column -> (candidate source columns in priority order, default value)
+    COLUMN_MAP = {
+        'Lượt xem': (('video_playcount', 'stats_playCount', 'play_count'), 0),
+        'Người Đăng': (('author_username', 'author_uniqueId', 'author_nickname'), 'Unknown'),
+        'Follower Người Đăng': (('author_followercount', 'authorStats_followerCount'), 0),
+    }
+    
     def process_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Process and format TikTok data"""
         if df.empty:
             return pd.DataFrame()
             
-        formatted_df = pd.DataFrame()
-        formatted_df['STT'] = range(1, len(df) + 1)
-        formatted_df['Link Video'] = df['source_link']
-        
-        # Handle different possible column names for view count
-        if 'video_playcount' in df.columns:
-            formatted_df['Lượt xem'] = df['video_playcount']
-        elif 'stats_playCount' in df.columns:
-            formatted_df['Lượt xem'] = df['stats_playCount']
-        elif 'play_count' in df.columns:
-            formatted_df['Lượt xem'] = df['play_count']
-        else:
-            formatted_df['Lượt xem'] = 0
-        
-        # Handle different possible column names for author
-        if 'author_username' in df.columns:
-            formatted_df['Người Đăng'] = df['author_username']
-        elif 'author_uniqueId' in df.columns:
-            formatted_df['Người Đăng'] = df['author_uniqueId']
-        elif 'author_nickname' in df.columns:
-            formatted_df['Người Đăng'] = df['author_nickname']
-        else:
-            formatted_df['Người Đăng'] = 'Unknown'
+        cols = set(df.columns)
         
-        # Handle different possible column names for follower count
-        if 'author_followercount' in df.columns:
-            formatted_df['Follower Người Đăng'] = df['author_followercount']
-        elif 'authorStats_followerCount' in df.columns:
-            formatted_df['Follower Người Đăng'] = df['authorStats_followerCount']
-        else:
-            formatted_df['Follower Người Đăng'] = 0
+        # Build every output column up front and create the frame in one go
+        data = {
+            'STT': np.arange(1, len(df) + 1, dtype=np.int32),
+            'Link Video': df['source_link'],
+        }
+        for target, (sources, default) in self.COLUMN_MAP.items():
+            source = next((c for c in sources if c in cols), None)
+            data[target] = df[source] if source is not None else default
         
-        return formatted_df
+        return pd.DataFrame(data, index=df.index)
 
 class CSVDataStorage(DataStorage):
     """Stores data in CSV files"""
@@ -164,6 +340,117 @@ class CSVDataStorage(DataStorage):
         print(f"Data saved to: {filepath}")
         
         return filepath
+    
+    def save_rows(self, rows: List[Dict], fieldnames: List[str], filename: str) -> str:
+        """Save a list of row dicts to a CSV file without building a DataFrame"""
+        if not rows:
+            return ""
+            
+        filepath = os.path.join(self.output_dir, filename)
+        
+        with open(filepath, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Data saved to: {filepath}")
+        
+        return filepath
+
+class ParquetDataStorage(StreamingDataStorage):
+    """Stores data in Parquet files, optionally streamed one batch at a time"""
+    def __init__(self, output_dir: str = "tiktok_data", compression: str = "zstd"):
+        """Initialize with output directory and compression codec"""
+        self.output_dir = output_dir
+        self.compression = compression
+        self._path = ""
+        self._parts: List[str] = []
+        self._writer = None
+        os.makedirs(output_dir, exist_ok=True)
+        
+    def save_data(self, df: pd.DataFrame, filename: str) -> str:
+        """Save data to a Parquet file in one go"""
+        if df.empty:
+            return ""
+            
+        filepath = os.path.join(self.output_dir, filename)
+        df.to_parquet(filepath, index=False, compression=self.compression)
+        print(f"Data saved to: {filepath}")
+        
+        return filepath
+    
+    def open(self, filename: str):
+        """Start streaming to a new Parquet file"""
+        self._path = os.path.join(self.output_dir, filename)
+        self._parts = []
+        self._writer = None
+        
+    def append(self, df: pd.DataFrame):
+        """Write rows to the open file, starting a new part file if the schema changes"""
+        if df.empty:
+            return
+            
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is not None:
+            conformed = self._conform_table(table, self._writer.schema)
+            if conformed is None:
+                # Never drop columns or fail a fetched row over a schema mismatch
+                self._writer.close()
+                self._writer = None
+            else:
+                table = conformed
+                
+        if self._writer is None:
+            if self._parts:
+                stem, ext = os.path.splitext(self._path)
+                part = f"{stem}_part{len(self._parts)}{ext}"
+                print(f"Schema changed, continuing in: {part}")
+            else:
+                part = self._path
+            self._writer = pq.ParquetWriter(part, table.schema, compression=self.compression)
+            self._parts.append(part)
+        self._writer.write_table(table)
+        
+    def close(self) -> str:
+        """Close the open file so everything written so far is readable"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            
+        if not self._parts:
+            return ""
+        print(f"Data saved to: {', '.join(self._parts)}")
+        return self._path
+        
+    def load(self) -> pd.DataFrame:
+        """Read back the rows written by the last stream"""
+        if not self._parts:
+            return pd.DataFrame()
+            
+        frames = [pq.read_table(part).to_pandas(types_mapper=pd.ArrowDtype) for part in self._parts]
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    
+    @staticmethod
+    def _conform_table(table: pa.Table, schema: pa.Schema) -> Optional[pa.Table]:
+        """Fit a table to the writer schema without losing data, or return None if it can't"""
+        # Columns the schema doesn't know about would be dropped
+        if not set(table.column_names) <= set(schema.names):
+            return None
+            
+        columns = []
+        for field in schema:
+            if field.name not in table.column_names:
+                columns.append(pa.nulls(len(table), type=field.type))
+                continue
+                
+            column = table.column(field.name)
+            if column.type != field.type:
+                try:
+                    # Safe casts only, e.g. null -> string; lossy ones raise
+                    column = column.cast(field.type)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                    return None
+            columns.append(column)
+        return pa.Table.from_arrays(columns, schema=schema)
 
 class GoogleSheetsDataStorage(DataStorage):
     """Stores data in Google Sheets"""
@@ -171,32 +458,21 @@ class GoogleSheetsDataStorage(DataStorage):
         """Initialize the storage"""
         pass
         
-    def _connect_to_google_sheets(self):
-        """Connect to Google Sheets API"""
-        import gspread
-        from oauth2client.service_account import ServiceAccountCredentials
-        
-        scope = ['https://spreadsheets.google.com/feeds', 
-                'https://www.googleapis.com/auth/drive']
-        credentials = ServiceAccountCredentials.from_json_keyfile_name(
-            "D:/4handy/Python/n8n-3-452909-dcc8b437ed91.json", scope)
-        client = gspread.authorize(credentials)
-        return client
-        
     def save_data(self, df: pd.DataFrame, sheet_name: str) -> str:
         """Save data to a Google Sheet"""
         if df.empty:
             return ""
             
         try:
-            client = self._connect_to_google_sheets()
+            client = _get_gspread_client()
             
             # Create a new spreadsheet
-            spreadsheet = client.create(sheet_name)
+            spreadsheet = retry_on_rate_limit(client.create)(sheet_name)
             spreadsheet_id = spreadsheet.id
             
             # Make it public (anyone with the link can view)
-            client.insert_permission(
+            # Permissions live in the Drive API, so this cannot join the Sheets batch
+            retry_on_rate_limit(client.insert_permission)(
                 spreadsheet_id,
                 None,  # No specific user email
                 perm_type='anyone',
@@ -206,12 +482,32 @@ class GoogleSheetsDataStorage(DataStorage):
             # Get the first worksheet
             worksheet = spreadsheet.get_worksheet(0)
             
-            # Convert DataFrame to list of lists for uploading
+            # Convert DataFrame to list of lists row by row, without building
+            # the object array behind df.values; missing values become blanks
             values = [df.columns.tolist()]  # First row is header
-            values.extend(df.values.tolist())  # Add data rows
+            values.extend(
+                ["" if pd.isna(v) else v for v in row]
+                for row in df.itertuples(index=False, name=None)
+            )
+            
+            # Size the sheet up front so the writes never trigger auto-grow
+            retry_on_rate_limit(worksheet.resize)(rows=len(values), cols=len(df.columns))
             
-            # Update the worksheet with the values
-            worksheet.update('A1', values)
+            # Split rows into value ranges of at most MAX_CELLS_PER_WRITE cells
+            chunk_rows = max(1, MAX_CELLS_PER_WRITE // len(df.columns))
+            data = [
+                {"range": f"A{start + 1}", "values": values[start:start + chunk_rows]}
+                for start in range(0, len(values), chunk_rows)
+            ]
+            
+            # Send the ranges with batch_update; a typical frame fits in one call,
+            # larger ones are split to keep each request under the size limit
+            ranges_per_request = max(1, MAX_CELLS_PER_REQUEST // MAX_CELLS_PER_WRITE)
+            for start in range(0, len(data), ranges_per_request):
+                retry_on_rate_limit(worksheet.batch_update)(
+                    data[start:start + ranges_per_request],
+                    value_input_option="RAW"
+                )
             
             print(f"Data successfully uploaded to Google Sheets")
             sheet_url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/edit?usp=sharing"
@@ -223,6 +519,56 @@ class GoogleSheetsDataStorage(DataStorage):
             print(f"Error uploading to Google Sheets: {str(e)}")
             return ""
 
+class RateLimiter:
+    """Limits concurrent requests and adapts their spacing to throttling"""
+    def __init__(self, max_concurrent: int = 4, min_interval: float = 0.5,
+                 initial_backoff: float = 1.0, max_backoff: float = 60.0):
+        """Initialize with concurrency cap and spacing/backoff limits in seconds"""
+        self.min_interval = min_interval
+        self.initial_interval = min_interval
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self._backoff = initial_backoff
+        self._semaphore = threading.Semaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        
+    def __enter__(self):
+        """Wait for a free slot and the next allowed start time"""
+        self._semaphore.acquire()
+        
+        # Reserve the next start time under the lock, then sleep outside it
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot)
+            self._next_slot = start + self.min_interval
+            
+        if start > now:
+            time.sleep(start - now)
+        return self
+        
+    def __exit__(self, exc_type, exc, tb):
+        """Release the slot"""
+        self._semaphore.release()
+        return False
+    
+    def throttled(self, suspected: bool = False) -> float:
+        """Record a rate-limit hit, pause every worker and return the delay"""
+        with self._lock:
+            delay = self._backoff
+            # Only confirmed throttling makes later requests slower
+            if not suspected:
+                self._backoff = min(self._backoff * 2, self.max_backoff)
+                self.min_interval = min(self.min_interval + 0.5, self.max_backoff)
+            self._next_slot = max(self._next_slot, time.monotonic() + delay)
+        return delay
+    
+    def succeeded(self):
+        """Record a successful request and relax the backoff and spacing"""
+        with self._lock:
+            self._backoff = max(self._backoff / 2, self.initial_backoff)
+            self.min_interval = max(self.min_interval - 0.5, self.initial_interval)
+
 class DataCollector:
     """Coordinates the data collection process"""
     def __init__(self, 
@@ -230,13 +576,23 @@ class DataCollector:
                 data_fetcher: DataFetcher,
                 data_processor: DataProcessor,
                 csv_storage: DataStorage,
-                sheets_storage: DataStorage):
-        """Initialize with components"""
+                sheets_storage: DataStorage,
+                raw_storage: StreamingDataStorage,
+                max_workers: int = 4,
+                min_interval: float = 0.5,
+                max_retries: int = 5,
+                save_raw: bool = False):
+        """Initialize with components, concurrency settings and raw CSV output flag"""
         self.data_source = data_source
         self.data_fetcher = data_fetcher
         self.data_processor = data_processor
         self.csv_storage = csv_storage
         self.sheets_storage = sheets_storage
+        self.raw_storage = raw_storage
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.save_raw = save_raw
+        self.rate_limiter = RateLimiter(max_concurrent=max_workers, min_interval=min_interval)
         
     def collect_data(self) -> Tuple[pd.DataFrame, List[Dict]]:
         """Collect and process data"""
@@ -244,81 +600,70 @@ class DataCollector:
         links = self.data_source.get_links()
         print(f"Found {len(links)} links to process")
         
-        # Initialize an empty DataFrame to hold all data
-        all_data = pd.DataFrame()
-        
-        # Create a directory for output if it doesn't exist
-        output_dir = "tiktok_data"
-        os.makedirs(output_dir, exist_ok=True)
-        
         # Create a timestamp for the output file
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Process each link
+        # Fetch each distinct link once, remembering every row it appeared in
+        url_to_indices: Dict[str, List[int]] = {}
+        for i, link in enumerate(links):
+            url_to_indices.setdefault(link, []).append(i)
+        unique_links = list(url_to_indices)
+        
+        # Fetch links concurrently, pacing requests through the rate limiter,
+        # and stream each link's rows to the raw storage as soon as they arrive
         results = []
+        self.raw_storage.open(f"all_tiktok_data_{timestamp}.parquet")
         
-        for i, link in enumerate(links):
-            try:
-                print(f"Processing link {i+1}/{len(links)}: {link}")
-                
-                # Create a temporary filename for this link's data
-                temp_filename = f"{output_dir}/temp_tiktok_data_{i+1}.csv"
-                
-                # Fetch data from the link
-                temp_data = self.data_fetcher.fetch_data(link, temp_filename)
-                
-                if not temp_data.empty:
-                    # Add link index
-                    temp_data['link_index'] = i+1
-                    
-                    # Append to the combined DataFrame
-                    all_data = pd.concat([all_data, temp_data], ignore_index=True)
-                    
-                    # Add to results
-                    results.append({
-                        "index": i+1,
-                        "link": link,
-                        "status": "Success"
-                    })
-                else:
-                    results.append({
-                        "index": i+1,
-                        "link": link,
-                        "status": "Failed",
-                        "error": "Empty data returned"
-                    })
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                future_to_link = {
+                    executor.submit(self._fetch_one, n, link, len(unique_links)): link
+                    for n, link in enumerate(unique_links)
+                }
                 
-                # Clean up temporary file
-                if os.path.exists(temp_filename):
-                    os.remove(temp_filename)
-                    
-                # Add 5 second sleep between requests to avoid being rate limited
-                if i < len(links) - 1:  # Don't sleep after the last item
-                    print(f"Waiting 5 seconds before processing next link...")
-                    time.sleep(5)
+                for future in as_completed(future_to_link):
+                    link = future_to_link[future]
+                    indices = url_to_indices[link]
+                    i = indices[0]
+                    try:
+                        temp_data = future.result()
+                        
+                        if not temp_data.empty:
+                            # Add link index
+                            temp_data['link_index'] = i+1
+                            
+                            # Persist this link's rows right away
+                            self.raw_storage.append(temp_data)
+                            
+                            outcome = {"status": "Success"}
+                        else:
+                            outcome = {"status": "Failed", "error": "Empty data returned"}
+                            
+                    except Exception as e:
+                        print(f"Error processing link {link}: {str(e)}")
+                        outcome = {"status": "Failed", "error": str(e)}
                     
-            except Exception as e:
-                print(f"Error processing link {link}: {str(e)}")
-                results.append({
-                    "index": i+1,
-                    "link": link,
-                    "status": "Failed",
-                    "error": str(e)
-                })
-                
-                # Still sleep after errors
-                if i < len(links) - 1:
-                    print(f"Waiting 5 seconds before processing next link...")
-                    time.sleep(5)
+                    # Report the outcome for every row that held this link
+                    for idx in indices:
+                        results.append({"index": idx+1, "link": link, **outcome})
+        finally:
+            self.raw_storage.close()
+        
+        # Restore the original link order
+        results.sort(key=lambda r: r["index"])
         
-        # Save all raw data to a single file
+        # Load everything written so far back for processing
+        all_data = self.raw_storage.load()
         if not all_data.empty:
+            all_data = all_data.sort_values('link_index', ignore_index=True)
+        
+        # The raw rows are already in the raw storage; a CSV copy is only for debugging
+        if self.save_raw and not all_data.empty:
             combined_filename = f"all_tiktok_data_{timestamp}.csv"
             self.csv_storage.save_data(all_data, combined_filename)
         
-        # Create a summary report
-        summary_df = pd.DataFrame(results)
-        self.csv_storage.save_data(summary_df, f"processing_summary_{timestamp}.csv")
+        # Create a summary report, written straight from the result rows
+        self.csv_storage.save_rows(results, SUMMARY_FIELDS, f"processing_summary_{timestamp}.csv")
         
         # Process all data
         if not all_data.empty:
@@ -333,6 +678,35 @@ class DataCollector:
             self.sheets_storage.save_data(processed_data, sheet_name)
         
         return all_data, results
+    
+    def _fetch_one(self, n: int, link: str, total: int) -> pd.DataFrame:
+        """Fetch a single link inside a rate limiter slot, retrying when throttled"""
+        suspected_retried = False
+        for _ in range(self.max_retries):
+            with self.rate_limiter:
+                print(f"Processing link {n+1}/{total}: {link}")
+                try:
+                    data = self.data_fetcher.fetch_data(link)
+                except NoVideoDataError:
+                    # Could be a dead link rather than throttling: retry once, no escalation
+                    if suspected_retried:
+                        raise
+                    suspected_retried = True
+                    delay = self.rate_limiter.throttled(suspected=True)
+                    print(f"No data for {link}, waiting {delay:.0f} seconds before one retry...")
+                    continue
+                except RateLimitedError:
+                    # The limiter pushes back the next slot for every worker
+                    delay = self.rate_limiter.throttled()
+                    print(f"Rate limited, waiting {delay:.0f} seconds before retrying {link}...")
+                    continue
+                    
+            # Only a real result counts as evidence that we are not throttled
+            if not data.empty:
+                self.rate_limiter.succeeded()
+            return data
+            
+        raise RateLimitedError(f"Still rate limited after {self.max_retries} attempts")
 
 # Main function
 def main():
@@ -344,6 +718,7 @@ def main():
     data_processor = TikTokDataProcessor()
     csv_storage = CSVDataStorage(output_dir="tiktok_data")
     sheets_storage = GoogleSheetsDataStorage()
+    raw_storage = ParquetDataStorage(output_dir="tiktok_data")
     
     # Create data collector
     collector = DataCollector(
@@ -351,7 +726,8 @@ def main():
         data_fetcher=data_fetcher,
         data_processor=data_processor,
         csv_storage=csv_storage,
-        sheets_storage=sheets_storage
+        sheets_storage=sheets_storage,
+        raw_storage=raw_storage
     )
     
     # Collect data